@@ -1,15 +1,18 @@
-import numpy as np
+import math
+import random
 from settings import *
 
 def ai_move(player, ball):
     offset = PLAYER_SIZE / 2
-    target = ball.pos - offset
-    to_ball = target - player.pos
-    dist = np.linalg.norm(to_ball)
+    to_ball_x = ball.pos.item(0) - offset - player.pos.item(0)
+    to_ball_y = ball.pos.item(1) - offset - player.pos.item(1)
+    dist = math.hypot(to_ball_x, to_ball_y)
 
     if dist > 10:
-        direction = to_ball / dist
-        player.pos += direction * PLAYER_SPEED * 0.9
+        step = PLAYER_SPEED * 0.9 / dist
+        player.pos[0] = player.pos.item(0) + to_ball_x * step
+        player.pos[1] = player.pos.item(1) + to_ball_y * step
     else:
         # Ball is too close, move slightly in random direction to free it
-        player.pos += np.random.uniform(-1, 1, 2) * 2
+        player.pos[0] = player.pos.item(0) + random.uniform(-1, 1) * 2
+        player.pos[1] = player.pos.item(1) + random.uniform(-1, 1) * 2
@@ -2,13 +2,15 @@ import pygame
 import time
 import numpy as np
 from settings import *
-from objects import Player, Ball
+from objects import Player, Ball, create_world, snapshot_world, restore_world
 from ai import ai_move
 from q_learning import QLearningAgent, q_move
+from planner import RolloutPlanner, plan_move
 
 
 class SoccerGame:
-    def __init__(self, use_q_learning=True, training_mode=True):
+    def __init__(self, use_q_learning=True, training_mode=True, use_planner=False, q_memory_budget=None,
+                 q_trace_decay=None):
         pygame.init()
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
         pygame.display.set_caption("Soccer Game with Q-Learning")
@@ -30,12 +32,23 @@ class SoccerGame:
         self.use_q_learning = use_q_learning
         self.training_mode  = training_mode
         if self.use_q_learning:
-            self.q_agent = QLearningAgent()
+            self.q_agent = QLearningAgent(memory_budget=q_memory_budget, trace_decay=q_trace_decay)
             self.auto_train = False
             self.max_episodes = 1000
             self.current_frame = 0
             self.max_frames_per_episode = 1800  # ~30 seconds at 60 FPS
 
+        # Rollout planner opponent (takes priority over Q-learning when on)
+        self.use_planner = use_planner
+        self.planner = RolloutPlanner()
+
+        # Players and ball are views over one world buffer, allocated once
+        self.world = create_world(3)
+        self.p1 = Player(0, 0, RED, state=self.world[0:2])
+        self.p2 = Player(0, 0, BLUE, ai=True, state=self.world[2:4])
+        self.p3 = Player(0, 0, YELLOW, state=self.world[4:6])
+        self.ball = Ball(0, 0, self.field_rect, state=self.world[6:10])
+
         # now set up players, ball, etc.
         self.reset()
 
@@ -60,8 +73,8 @@ class SoccerGame:
         self.toggle_field_size()
         
         # إعادة تعيين مواقع اللاعبين الأحمر والأزرق
-        self.p1 = Player(WIDTH//4, HEIGHT//2, RED)
-        self.p2 = Player(3*WIDTH//4, HEIGHT//2, BLUE, ai=True)
+        self.p1.reset(WIDTH//4, HEIGHT//2)
+        self.p2.reset(3*WIDTH//4, HEIGHT//2)
 
         # إنشاء اللاعب الثالث (الأصفر)
         # إنشاء اللاعب الثالث
@@ -73,11 +86,13 @@ class SoccerGame:
             # بعد اختيار الفريق: الجانب الأعلى للملعب
             spawn_x = WIDTH//4 if self.p3_team == 1 else 3*WIDTH//4
             spawn_y = HEIGHT // 2 - 100
-        self.p3 = Player(spawn_x, spawn_y, YELLOW)
+        self.p3.reset(spawn_x, spawn_y)
 
         
         # إعادة تعيين الكرة والنتيجة وبقية الحالة
-        self.ball  = Ball(WIDTH//2, HEIGHT//2, self.field_rect, is_large_field=self.is_large_field)
+        self.ball.bounds = self.field_rect
+        self.ball.is_large_field = self.is_large_field
+        self.ball.reset(WIDTH//2, HEIGHT//2)
         self.score         = [0, 0]
         self.game_active   = False
         self.countdown     = 3
@@ -89,6 +104,14 @@ class SoccerGame:
         if hasattr(self, 'q_agent') and self.use_q_learning:
             self.q_agent.end_episode()
 
+    def snapshot(self, out=None):
+        """Pack players and ball into one float32 buffer (see snapshot_world)"""
+        return snapshot_world((self.p1, self.p2, self.p3), self.ball, out=out)
+
+    def restore(self, state):
+        """Restore players and ball from a buffer returned by snapshot()"""
+        restore_world(state, (self.p1, self.p2, self.p3), self.ball)
+
     def handle_events(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -113,6 +136,10 @@ class SoccerGame:
             if event.type == pygame.KEYDOWN and self.game_state != STATE_TEAM_SELECT:
                 if event.key == pygame.K_r and self.winner:
                     self.reset()
+                elif event.key == pygame.K_p:
+                    # Toggle rollout planner
+                    self.use_planner = not self.use_planner
+                    print(f"Planner: {'ON' if self.use_planner else 'OFF'}")
                 elif event.key == pygame.K_q and self.use_q_learning:
                     # Toggle Q-learning
                     self.use_q_learning = not self.use_q_learning
@@ -158,7 +185,9 @@ class SoccerGame:
         )
 
         # 3. حركة اللاعب الآلي (أزرق)
-        if self.use_q_learning:
+        if self.use_planner:
+            plan_move(self.p2, self.ball, (self.p1, self.p3), self.planner)
+        elif self.use_q_learning:
             q_move(self.p2, self.ball, self.p1, self.q_agent, training=self.training_mode)
         else:
             ai_move(self.p2, self.ball)
@@ -200,10 +229,10 @@ class SoccerGame:
     def _check_goal(self):
         goal = self.ball.check_goal()
         if goal == 1:
-            self.score[1] += 1
+            self.score[0] += 1
             self._after_goal()
         elif goal == 2:
-            self.score[0] += 1
+            self.score[1] += 1
             self._after_goal()
 
         if self.score[0] >= WINNING_SCORE:
@@ -330,6 +359,13 @@ class SoccerGame:
                 self.screen.blit(self.small_font.render(ctl, True, WHITE), (WIDTH - 150, y))
                 y += 20
 
+        # 9. حالة المخطط (تعمل في كل الأوضاع، أسفل معلومات Q-learning إن وُجدت)
+        planner_text = f"Planner: {'ON' if self.use_planner else 'OFF'}"
+        y = 130 if self.use_q_learning else 10
+        self.screen.blit(self.small_font.render(planner_text, True, WHITE), (10, y))
+        y = 110 if self.use_q_learning else 10
+        self.screen.blit(self.small_font.render("P: Toggle planner", True, WHITE), (WIDTH - 150, y))
+
         pygame.display.flip()
         self.clock.tick(FPS)
 
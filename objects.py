@@ -1,13 +1,49 @@
+import math
 import pygame
 import numpy as np
 from settings import *
 
+def create_world(player_count):
+    """Allocate a flat world buffer in the snapshot_world layout for entities to share"""
+    return np.zeros(2 * player_count + 4, dtype=np.float32)
+
+def snapshot_world(players, ball, out=None):
+    """
+    Pack the world state into one flat float32 buffer.
+
+    Layout: [x, y] for each player in order, then ball [x, y, vx, vy].
+    Pass a preallocated `out` to avoid allocating a new array.
+    """
+    n = 2 * len(players)
+    if out is None:
+        out = np.empty(n + 4, dtype=np.float32)
+    for i, player in enumerate(players):
+        out[2*i:2*i + 2] = player.pos
+    out[n:n + 2] = ball.pos
+    out[n + 2:n + 4] = ball.vel
+    return out
+
+def restore_world(state, players, ball):
+    """Write a buffer produced by snapshot_world back into the entities in place"""
+    n = 2 * len(players)
+    for i, player in enumerate(players):
+        player.pos[:] = state[2*i:2*i + 2]
+    ball.pos[:] = state[n:n + 2]
+    ball.vel[:] = state[n + 2:n + 4]
+
 class Player:
-    def __init__(self, x, y, color, ai=False):
-        self.pos = np.array([x, y], dtype=np.float32)
+    __slots__ = ('pos', 'prev_pos', 'color', 'ai')
+
+    def __init__(self, x, y, color, ai=False, state=None):
+        """
+        `state` is an optional 2-float view into a world buffer (see
+        create_world) that backs `pos`; without it the player owns its own.
+        """
+        self.pos = np.empty(2, dtype=np.float32) if state is None else state
+        self.prev_pos = np.empty(2, dtype=np.float32)
         self.color = color
         self.ai = ai
-        self.prev_pos = self.pos.copy()
+        self.reset(x, y)
 
     def move(self, keys, bounds, up=None, down=None, left=None, right=None):
         """
@@ -15,7 +51,7 @@ class Player:
         If ai=True, do nothing. Otherwise, use the provided key mappings
         or default to WASD.
         """
-        self.prev_pos = self.pos.copy()
+        np.copyto(self.prev_pos, self.pos)
         if self.ai:
             return
 
@@ -25,72 +61,98 @@ class Player:
         left_key  = left  or pygame.K_a
         right_key = right or pygame.K_d
 
-        # Apply movement
+        # Apply movement (item() reads plain floats, so no numpy scalars per frame)
         if keys[up_key]:
-            self.pos[1] -= PLAYER_SPEED
+            self.pos[1] = self.pos.item(1) - PLAYER_SPEED
         if keys[down_key]:
-            self.pos[1] += PLAYER_SPEED
+            self.pos[1] = self.pos.item(1) + PLAYER_SPEED
         if keys[left_key]:
-            self.pos[0] -= PLAYER_SPEED
+            self.pos[0] = self.pos.item(0) - PLAYER_SPEED
         if keys[right_key]:
-            self.pos[0] += PLAYER_SPEED
+            self.pos[0] = self.pos.item(0) + PLAYER_SPEED
 
         # Constrain within bounds
         self._clamp(bounds)
 
     def reset(self, x, y):
-        self.pos = np.array([x, y], dtype=np.float32)
-        self.prev_pos = self.pos.copy()
+        self.pos[0] = x
+        self.pos[1] = y
+        self.prev_pos[:] = self.pos
 
     def draw(self, screen):
-        pygame.draw.rect(screen, self.color, (*self.pos.astype(int), PLAYER_SIZE, PLAYER_SIZE))
+        pygame.draw.rect(screen, self.color, (int(self.pos[0]), int(self.pos[1]), PLAYER_SIZE, PLAYER_SIZE))
 
     def _clamp(self, rect):
-        self.pos[0] = np.clip(self.pos[0], rect.left, rect.right - PLAYER_SIZE)
-        self.pos[1] = np.clip(self.pos[1], rect.top, rect.bottom - PLAYER_SIZE)
+        pos = self.pos
+        pos[0] = min(max(pos.item(0), rect.left), rect.right - PLAYER_SIZE)
+        pos[1] = min(max(pos.item(1), rect.top), rect.bottom - PLAYER_SIZE)
 
 class Ball:
-    def __init__(self, x, y, bounds, is_large_field=False):
+    __slots__ = ('bounds', 'pos', 'vel', 'is_large_field')
+
+    def __init__(self, x, y, bounds, is_large_field=False, state=None):
+        """
+        `state` is an optional 4-float view into a world buffer (see
+        create_world) that backs `pos` and `vel`; without it the ball owns its own.
+        """
+        if state is None:
+            state = np.empty(4, dtype=np.float32)
         self.bounds = bounds
-        self.pos = np.array([x, y], dtype=np.float32)
-        self.vel = self._random_velocity()
+        self.pos = state[0:2]
+        self.vel = state[2:4]
         self.is_large_field = is_large_field
+        self.reset(x, y)
 
-    def _random_velocity(self):
+    def _randomize_velocity(self):
         angle = np.random.uniform(0, 2*np.pi)
-        return np.array([BALL_SPEED * np.cos(angle), BALL_SPEED * np.sin(angle)], dtype=np.float32)
+        self.vel[0] = BALL_SPEED * math.cos(angle)
+        self.vel[1] = BALL_SPEED * math.sin(angle)
 
     def update(self):
-        self.pos += self.vel
-        self.vel *= 0.98 if np.linalg.norm(self.vel) > 0.1 else 0
-
-        if self.pos[1] <= self.bounds.top + BALL_RADIUS or self.pos[1] >= self.bounds.bottom - BALL_RADIUS:
-            self.vel[1] *= -0.9
-            self.pos[1] = np.clip(self.pos[1], self.bounds.top + BALL_RADIUS, self.bounds.bottom - BALL_RADIUS)
-        if self.pos[0] <= self.bounds.left + BALL_RADIUS or self.pos[0] >= self.bounds.right - BALL_RADIUS:
-            self.vel[0] *= -0.9
-            self.pos[0] = np.clip(self.pos[0], self.bounds.left + BALL_RADIUS, self.bounds.right - BALL_RADIUS)
+        bounds = self.bounds
+        vx, vy = self.vel.item(0), self.vel.item(1)
+        x, y = self.pos.item(0) + vx, self.pos.item(1) + vy
+        friction = 0.98 if math.hypot(vx, vy) > 0.1 else 0
+        vx *= friction
+        vy *= friction
+
+        top, bottom = bounds.top + BALL_RADIUS, bounds.bottom - BALL_RADIUS
+        left, right = bounds.left + BALL_RADIUS, bounds.right - BALL_RADIUS
+        if y <= top or y >= bottom:
+            vy *= -0.9
+            y = min(max(y, top), bottom)
+        if x <= left or x >= right:
+            vx *= -0.9
+            x = min(max(x, left), right)
+
+        self.pos[0], self.pos[1] = x, y
+        self.vel[0], self.vel[1] = vx, vy
 
     def collide_with_player(self, player):
         offset = PLAYER_SIZE / 2
-        dist = np.linalg.norm(self.pos - (player.pos + offset))
+        dx = self.pos.item(0) - (player.pos.item(0) + offset)
+        dy = self.pos.item(1) - (player.pos.item(1) + offset)
+        dist = math.hypot(dx, dy)
         if dist < BALL_RADIUS + offset:
-            normal = (self.pos - (player.pos + offset)) / dist
-            self.vel += normal * BALL_SPEED * 0.6
+            push = BALL_SPEED * 0.6 / max(dist, 1e-6)
+            self.vel[0] = self.vel.item(0) + dx * push
+            self.vel[1] = self.vel.item(1) + dy * push
 
     def draw(self, screen):
-        pygame.draw.circle(screen, WHITE, self.pos.astype(int), BALL_RADIUS)
+        pygame.draw.circle(screen, WHITE, (int(self.pos[0]), int(self.pos[1])), BALL_RADIUS)
 
-    def reset(self):
-        self.pos = np.array([WIDTH//2, HEIGHT//2], dtype=np.float32)
-        self.vel = self._random_velocity()
+    def reset(self, x=WIDTH//2, y=HEIGHT//2):
+        self.pos[0] = x
+        self.pos[1] = y
+        self._randomize_velocity()
 
     def check_goal(self):
-        y = self.pos[1]
+        """Return the player who scored: 2 at the left wall (red's goal), 1 at the right wall, else 0"""
+        x, y = self.pos.item(0), self.pos.item(1)
         goal_y_offset = 110 if self.is_large_field else 0
         if (HEIGHT//2 - GOAL_WIDTH//2 + goal_y_offset) < y < (HEIGHT//2 + GOAL_WIDTH//2 + goal_y_offset):
-            if self.pos[0] <= self.bounds.left + BALL_RADIUS:
+            if x <= self.bounds.left + BALL_RADIUS:
                 return 2
-            elif self.pos[0] >= self.bounds.right - BALL_RADIUS:
+            elif x >= self.bounds.right - BALL_RADIUS:
                 return 1
         return 0
\ No newline at end of file
@@ -0,0 +1,170 @@
+import time
+import numpy as np
+from settings import *
+from objects import snapshot_world
+
+class RolloutPlanner:
+    def __init__(self, rollout_count=64, horizon=24, action_repeat=6, discount_factor=0.97,
+                 team=2, time_budget=0.005):
+        """
+        Initialize Monte Carlo rollout planner
+
+        Args:
+            rollout_count: Maximum number of candidate action sequences simulated per frame
+            horizon: Number of frames simulated per rollout
+            action_repeat: Frames each sampled action is held for
+            discount_factor: Gamma, per-frame discount of rollout rewards
+            team: Player number the planner scores for, as returned by Ball.check_goal
+                (2 scores at the left wall, 1 at the right wall)
+            time_budget: Seconds plan() may spend per frame; rollouts are cut short
+                when it runs out and the batch shrinks for the next frame
+        """
+        self.max_rollout_count = rollout_count
+        self.rollout_count = rollout_count
+        self.horizon = horizon
+        self.action_repeat = action_repeat
+        self.discount_factor = discount_factor
+        self.team = team
+        self.attack_direction = -1 if team == 2 else 1
+        self.time_budget = time_budget
+
+        # Reward shaping weights
+        self.goal_reward = 100.0
+        self.distance_weight = 0.01
+
+        # Actions: 0=UP, 1=DOWN, 2=LEFT, 3=RIGHT (same as QLearningAgent)
+        self.action_count = 4
+        speed = PLAYER_SPEED * 0.7  # Same speed as q_move
+        self.moves = np.array([[0, -speed], [0, speed], [-speed, 0], [speed, 0]], dtype=np.float32)
+
+        self.discounts = discount_factor ** np.arange(horizon, dtype=np.float32)
+        self.rng = np.random.default_rng()
+        self._state = None
+
+    def state_buffer(self, player_count):
+        """Return a reusable buffer sized for snapshot_world with player_count players"""
+        size = 2 * player_count + 4
+        if self._state is None or self._state.shape[0] != size:
+            self._state = np.empty(size, dtype=np.float32)
+        return self._state
+
+    def sample_plans(self):
+        """Sample action sequences, covering every first action evenly"""
+        segments = -(-self.horizon // self.action_repeat)
+        plans = self.rng.integers(0, self.action_count, size=(self.rollout_count, segments))
+        plans[:, 0] = np.arange(self.rollout_count) % self.action_count
+        return plans
+
+    def plan(self, state, bounds, is_large_field=False):
+        """
+        Choose an action for the first player in a snapshot_world buffer
+
+        All rollouts are simulated together as one batch. Other players are
+        treated as stationary obstacles for the length of the horizon.
+        Simulation stops at the time budget, and the batch size adapts so
+        the next frame fits in it.
+        """
+        start = time.perf_counter()
+        deadline = start + self.time_budget
+        n = self.rollout_count
+        player_count = (state.shape[0] - 4) // 2
+        b = 2 * player_count
+        offset = PLAYER_SIZE / 2
+
+        plans = self.sample_plans()
+        pos = np.tile(state[0:2], (n, 1))
+        ball_pos = np.tile(state[b:b + 2], (n, 1))
+        ball_vel = np.tile(state[b + 2:b + 4], (n, 1))
+        others = state[2:b].reshape(-1, 2) + offset
+
+        player_lo = np.array([bounds.left, bounds.top], dtype=np.float32)
+        player_hi = np.array([bounds.right - PLAYER_SIZE, bounds.bottom - PLAYER_SIZE], dtype=np.float32)
+        ball_lo = np.array([bounds.left + BALL_RADIUS, bounds.top + BALL_RADIUS], dtype=np.float32)
+        ball_hi = np.array([bounds.right - BALL_RADIUS, bounds.bottom - BALL_RADIUS], dtype=np.float32)
+        goal_y_offset = 110 if is_large_field else 0
+        goal_top = HEIGHT//2 - GOAL_WIDTH//2 + goal_y_offset
+        goal_bottom = HEIGHT//2 + GOAL_WIDTH//2 + goal_y_offset
+
+        returns = np.zeros(n, dtype=np.float32)
+        alive = np.ones(n, dtype=bool)
+
+        for t in range(self.horizon):
+            prev_ball_x = ball_pos[:, 0].copy()
+
+            # Player movement (same as q_move + Player._clamp)
+            pos += self.moves[plans[:, t // self.action_repeat]]
+            np.clip(pos, player_lo, player_hi, out=pos)
+
+            # Ball movement (same as Ball.update)
+            ball_pos += ball_vel
+            moving = np.linalg.norm(ball_vel, axis=1) > 0.1
+            ball_vel *= np.where(moving, 0.98, 0.0)[:, None]
+            hit_wall = (ball_pos <= ball_lo) | (ball_pos >= ball_hi)
+            ball_vel[hit_wall] *= -0.9
+            np.clip(ball_pos, ball_lo, ball_hi, out=ball_pos)
+
+            # Collisions (same as Ball.collide_with_player)
+            self._collide(ball_pos, ball_vel, pos + offset)
+            for centre in others:
+                self._collide(ball_pos, ball_vel, centre)
+
+            # Goals (same as Ball.check_goal)
+            in_mouth = (goal_top < ball_pos[:, 1]) & (ball_pos[:, 1] < goal_bottom)
+            at_left = in_mouth & (ball_pos[:, 0] <= ball_lo[0])
+            at_right = in_mouth & (ball_pos[:, 0] >= ball_hi[0])
+            scored, conceded = (at_left, at_right) if self.team == 2 else (at_right, at_left)
+
+            # Reward ball progress towards the attacked goal and staying near the ball
+            progress = (ball_pos[:, 0] - prev_ball_x) * self.attack_direction
+            ball_dist = np.linalg.norm(ball_pos - (pos + offset), axis=1)
+            reward = progress - self.distance_weight * ball_dist
+            reward += self.goal_reward * (scored.astype(np.float32) - conceded)
+            returns += self.discounts[t] * reward * alive
+
+            # A goal ends the rollout
+            alive &= ~(scored | conceded)
+
+            if time.perf_counter() > deadline:
+                # Out of time: score the rollouts so far, use a smaller batch next frame
+                self.rollout_count = max(self.action_count, self.rollout_count // 2)
+                break
+        else:
+            if time.perf_counter() - start < 0.75 * self.time_budget:
+                self.rollout_count = min(self.max_rollout_count, self.rollout_count + self.action_count)
+
+        # Score each first action by its best rollout
+        best = np.full(self.action_count, -np.inf, dtype=np.float32)
+        np.maximum.at(best, plans[:, 0], returns)
+        return int(np.argmax(best))
+
+    @staticmethod
+    def _collide(ball_pos, ball_vel, centre):
+        """Apply a player collision to every rollout in the batch"""
+        delta = ball_pos - centre
+        dist = np.linalg.norm(delta, axis=1)
+        hit = dist < BALL_RADIUS + PLAYER_SIZE / 2
+        if hit.any():
+            normal = delta[hit] / np.maximum(dist[hit], 1e-6)[:, None]
+            ball_vel[hit] += normal * BALL_SPEED * 0.6
+
+# Planner movement function, alternative to ai_move and q_move
+def plan_move(player, ball, opponents, planner):
+    """
+    Move the AI player using rollout planning
+
+    Args:
+        player: AI player object
+        ball: Ball object
+        opponents: Other player objects, treated as obstacles
+        planner: RolloutPlanner instance
+
+    Returns:
+        The chosen action index, usable as a teacher label for QLearningAgent
+    """
+    players = (player, *opponents)
+    state = snapshot_world(players, ball, out=planner.state_buffer(len(players)))
+    action = planner.plan(state, ball.bounds, is_large_field=ball.is_large_field)
+
+    player.pos += planner.moves[action]
+    player._clamp(ball.bounds)
+    return action
@@ -1,10 +1,14 @@
+import math
 import numpy as np
 import random
 import pickle
 from settings import *
+from q_table import SparseQTable, EligibilityTraces
 
 class QLearningAgent:
-    def __init__(self, learning_rate=0.1, discount_factor=0.9, exploration_rate=0.3, exploration_decay=0.9999):
+    def __init__(self, learning_rate=0.1, discount_factor=0.9, exploration_rate=0.3, exploration_decay=0.9999,
+                 memory_budget=None, resolutions=((4, 3), (8, 5), (16, 10)),
+                 trace_decay=None, trace_cutoff=0.01):
         """
         Initialize Q-Learning Agent
         
@@ -13,6 +17,12 @@ class QLearningAgent:
             discount_factor: Gamma, future reward discount factor
             exploration_rate: Epsilon, probability of random action
             exploration_decay: Rate at which exploration decreases
+            memory_budget: Bytes for a SparseQTable backend; None keeps the unbounded dict
+            resolutions: (grid_x, grid_y) per SparseQTable level, coarse to fine
+            trace_decay: Lambda for Watkins Q(lambda); None keeps one-step Q-learning.
+                Traces live on SparseQTable slots, so this switches to that backend,
+                with SparseQTable.DEFAULT_MEMORY_BUDGET if memory_budget is None
+            trace_cutoff: Trace value below which Q(lambda) drops an entry
         """
         self.learning_rate = learning_rate
         self.discount_factor = discount_factor
@@ -27,37 +37,70 @@ class QLearningAgent:
         # Actions: 0=UP, 1=DOWN, 2=LEFT, 3=RIGHT
         self.action_count = 4
         
-        # Initialize Q-table as dictionary
-        self.q_table = {}
+        # Initialize Q-table as dictionary, or as a budgeted multi-resolution
+        # table whose states also include the opponent's cell
+        if trace_decay is not None and memory_budget is None:
+            memory_budget = SparseQTable.DEFAULT_MEMORY_BUDGET
+        self.sparse = memory_budget is not None
+        self.memory_budget = memory_budget
+        self.resolutions = resolutions
+        if self.sparse:
+            sample_key = self._discretize((0, 0), (0, 0), (0, 0), *resolutions[-1], with_player=True)
+            self.q_table = SparseQTable(len(resolutions), self.action_count, memory_budget=memory_budget,
+                                        sample_key=sample_key)
+        else:
+            self.q_table = {}
+
+        # Watkins Q(lambda) eligibility traces over SparseQTable slots
+        self.trace_decay = trace_decay
+        self.traces = None
+        if trace_decay is not None:
+            self.traces = EligibilityTraces(cutoff=trace_cutoff)
         
         # Training metrics
         self.episode_count = 0
         self.total_reward = 0
         self.rewards_history = []
+
+        # Scratch buffers reused by q_move every frame
+        self._prev_pos = np.zeros(2, dtype=np.float32)
+        self._prev_ball_pos = np.zeros(2, dtype=np.float32)
         
     def discretize_state(self, ai_pos, ball_pos, player_pos):
         """Convert continuous positions to discrete state"""
+        if self.sparse:
+            # One key per resolution level, including the opponent's cell. A plain
+            # loop, since a comprehension would allocate closure cells on every call
+            keys = []
+            for grid_x, grid_y in self.resolutions:
+                keys.append(self._discretize(ai_pos, ball_pos, player_pos, grid_x, grid_y, with_player=True))
+            return tuple(keys)
+        return self._discretize(ai_pos, ball_pos, player_pos, self.grid_size_x, self.grid_size_y)
+
+    def _discretize(self, ai_pos, ball_pos, player_pos, grid_x, grid_y, with_player=False):
         # Convert positions to grid cells
-        ai_x = int(ai_pos[0] / WIDTH * self.grid_size_x)
-        ai_y = int(ai_pos[1] / HEIGHT * self.grid_size_y)
-        ball_x = int(ball_pos[0] / WIDTH * self.grid_size_x)
-        ball_y = int(ball_pos[1] / HEIGHT * self.grid_size_y)
-        player_x = int(player_pos[0] / WIDTH * self.grid_size_x)
-        player_y = int(player_pos[1] / HEIGHT * self.grid_size_y)
+        ai_x, ai_y = _coords(ai_pos)
+        ball_x, ball_y = _coords(ball_pos)
+        player_x, player_y = _coords(player_pos)
+        ai_x, ai_y = int(ai_x / WIDTH * grid_x), int(ai_y / HEIGHT * grid_y)
+        ball_x, ball_y = int(ball_x / WIDTH * grid_x), int(ball_y / HEIGHT * grid_y)
+        player_x, player_y = int(player_x / WIDTH * grid_x), int(player_y / HEIGHT * grid_y)
         
         # Ensure values are within bounds
-        ai_x = max(0, min(ai_x, self.grid_size_x - 1))
-        ai_y = max(0, min(ai_y, self.grid_size_y - 1))
-        ball_x = max(0, min(ball_x, self.grid_size_x - 1))
-        ball_y = max(0, min(ball_y, self.grid_size_y - 1))
-        player_x = max(0, min(player_x, self.grid_size_x - 1))
-        player_y = max(0, min(player_y, self.grid_size_y - 1))
+        ai_x = max(0, min(ai_x, grid_x - 1))
+        ai_y = max(0, min(ai_y, grid_y - 1))
+        ball_x = max(0, min(ball_x, grid_x - 1))
+        ball_y = max(0, min(ball_y, grid_y - 1))
+        player_x = max(0, min(player_x, grid_x - 1))
+        player_y = max(0, min(player_y, grid_y - 1))
         
         # Calculate relative positions (important for generalization)
         ball_rel_x = ball_x - ai_x
         ball_rel_y = ball_y - ai_y
         
         # Return as hashable state tuple
+        if with_player:
+            return (ai_x, ai_y, ball_rel_x, ball_rel_y, ball_x, ball_y, player_x, player_y)
         return (ai_x, ai_y, ball_rel_x, ball_rel_y, ball_x, ball_y)
     
     def choose_action(self, state):
@@ -71,15 +114,34 @@ class QLearningAgent:
     
     def get_best_action(self, state):
         """Get best action for state based on Q-values"""
+        # Return action with highest Q-value (first on ties, like np.argmax);
+        # a 4-item list is cheaper per frame than numpy's reductions
+        q_values = self.q_values(state).tolist()
+        return q_values.index(max(q_values))
+
+    def q_values(self, state):
+        """Get Q-values for state from whichever backend is in use"""
+        if self.sparse:
+            return self.q_table.values(state)
+
         if state not in self.q_table:
             # Initialize new state with zeros
             self.q_table[state] = np.zeros(self.action_count)
-        
-        # Return action with highest Q-value
-        return np.argmax(self.q_table[state])
+        return self.q_table[state]
     
     def update_q_value(self, state, action, reward, next_state):
         """Update Q-value using the Q-learning formula"""
+        if self.traces is not None:
+            self._update_traced(state, action, reward, next_state)
+            self.total_reward += reward
+            return
+
+        if self.sparse:
+            best_next_q = max(self.q_table.values(next_state).tolist())
+            self.q_table.update(state, action, reward + self.discount_factor * best_next_q, self.learning_rate)
+            self.total_reward += reward
+            return
+
         if state not in self.q_table:
             self.q_table[state] = np.zeros(self.action_count)
             
@@ -87,8 +149,8 @@ class QLearningAgent:
             self.q_table[next_state] = np.zeros(self.action_count)
             
         # Q-Learning formula: Q(s,a) = Q(s,a) + α * [R + γ * max(Q(s',a')) - Q(s,a)]
-        best_next_q = np.max(self.q_table[next_state])
-        current_q = self.q_table[state][action]
+        best_next_q = max(self.q_table[next_state].tolist())
+        current_q = self.q_table[state].item(action)
         
         # Update Q-value
         self.q_table[state][action] = current_q + self.learning_rate * (
@@ -98,8 +160,32 @@ class QLearningAgent:
         # Update metrics
         self.total_reward += reward
     
+    def _update_traced(self, state, action, reward, next_state):
+        """Watkins Q(lambda) update of every traced entry"""
+        table = self.q_table
+
+        # Exploratory action: earlier steps no longer follow the greedy policy
+        if action != self.get_best_action(state):
+            self.traces.clear()
+
+        evicted = []
+        slots = table.slots(state, evicted)
+        if evicted:
+            # Freed slots may be reused by other states
+            self.traces.discard(np.concatenate(evicted))
+
+        # One TD error per resolution level, applied to all traced entries at once
+        target = reward + self.discount_factor * max(table.values(next_state).tolist())
+        deltas = target - table.q[slots, action]
+        self.traces.visit(slots, action)
+        self.traces.apply(table.q, deltas, self.learning_rate)
+        self.traces.decay(self.discount_factor * self.trace_decay)
+
     def end_episode(self):
         """Call at end of episode to update parameters"""
+        if self.traces is not None:
+            self.traces.clear()
+
         self.rewards_history.append(self.total_reward)
         self.total_reward = 0
         self.episode_count += 1
@@ -120,7 +206,23 @@ class QLearningAgent:
         """Load Q-table from file"""
         try:
             with open(filename, 'rb') as f:
-                self.q_table = pickle.load(f)
+                q_table = pickle.load(f)
+            if isinstance(q_table, SparseQTable) != self.sparse:
+                print(f"{filename} does not match the Q-table backend in use")
+                return False
+            if self.sparse and (q_table.level_count != len(self.resolutions)
+                                or q_table.action_count != self.action_count):
+                print(f"{filename} has {q_table.level_count} levels of {q_table.action_count} actions, "
+                      f"expected {len(self.resolutions)} of {self.action_count}")
+                return False
+            if self.sparse and q_table.capacity * q_table.entry_bytes > self.memory_budget:
+                print(f"{filename} holds {q_table.capacity} entries, "
+                      f"more than the memory_budget of {self.memory_budget} bytes allows")
+                return False
+            self.q_table = q_table
+            if self.traces is not None:
+                # Trace slots index the old table
+                self.traces.clear()
             print(f"Q-table loaded from {filename}")
             return True
         except FileNotFoundError:
@@ -148,22 +250,24 @@ def q_move(player, ball, opponent, agent, training=True):
     else:
         action = agent.get_best_action(state)
     
-    # Store player position before moving
-    prev_pos = player.pos.copy()
-    prev_ball_pos = ball.pos.copy()
-    ball_dist_before = np.linalg.norm(player.pos - ball.pos)
+    # Store positions before moving (in place, no per-frame allocation)
+    prev_pos = agent._prev_pos
+    np.copyto(prev_pos, player.pos)
+    prev_ball_pos = agent._prev_ball_pos
+    np.copyto(prev_ball_pos, ball.pos)
+    ball_dist_before = _distance(player.pos, ball.pos)
     
     # Execute action based on action index
     speed = PLAYER_SPEED * 0.7  # Same speed reduction as original AI
     
     if action == 0:  # UP
-        player.pos[1] -= speed
+        player.pos[1] = player.pos.item(1) - speed
     elif action == 1:  # DOWN
-        player.pos[1] += speed
+        player.pos[1] = player.pos.item(1) + speed
     elif action == 2:  # LEFT
-        player.pos[0] -= speed
+        player.pos[0] = player.pos.item(0) - speed
     elif action == 3:  # RIGHT
-        player.pos[0] += speed
+        player.pos[0] = player.pos.item(0) + speed
     
     # Ensure player stays in bounds
     player._clamp(ball.bounds)
@@ -183,7 +287,7 @@ def calculate_reward(player, ball, prev_pos, prev_ball_pos, ball_dist_before):
     reward = 0
     
     # Distance to ball
-    ball_dist_after = np.linalg.norm(player.pos - ball.pos)
+    ball_dist_after = _distance(player.pos, ball.pos)
     
     # Reward for moving closer to ball
     if ball_dist_after < ball_dist_before:
@@ -192,21 +296,30 @@ def calculate_reward(player, ball, prev_pos, prev_ball_pos, ball_dist_before):
         reward -= 0.5
         
     # Check if ball moved (possible hit)
-    ball_movement = np.linalg.norm(ball.pos - prev_ball_pos)
+    ball_movement = _distance(ball.pos, prev_ball_pos)
     if ball_movement > 1.0:
         # Ball was hit
         reward += 5
         
         # Extra reward if ball moves toward opponent's goal (left side)
-        if ball.vel[0] < 0:
+        if ball.vel.item(0) < 0:
             reward += 3
             
     # Penalty for being too close to own goal (right side)
-    if player.pos[0] > WIDTH * 0.75:
+    if player.pos.item(0) > WIDTH * 0.75:
         reward -= 1
         
     # Penalty for being too far from ball
     if ball_dist_after > WIDTH / 3:
         reward -= 0.5
             
-    return reward
\ No newline at end of file
+    return reward
+
+def _coords(pos):
+    """Read a position as plain floats; item() avoids a numpy scalar per coordinate"""
+    if isinstance(pos, np.ndarray):
+        return pos.item(0), pos.item(1)
+    return pos[0], pos[1]
+
+def _distance(a, b):
+    return math.hypot(a.item(0) - b.item(0), a.item(1) - b.item(1))
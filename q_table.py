@@ -0,0 +1,229 @@
+import sys
+import numpy as np
+
+def _object_bytes(obj):
+    """sys.getsizeof rounded up to the allocator's 16-byte blocks"""
+    return -(-sys.getsizeof(obj) // 16) * 16
+
+class SparseQTable:
+    # Worst-case dict cost per key while resizing: 24-byte entries for the old
+    # table plus up to 4x in the new one, and 4-byte index slots (1.5x + 6x)
+    DICT_ENTRY_BYTES = 5 * 24 + 8 * 4
+    # Temporaries created per slot while scoring entries in evict()
+    EVICT_SCRATCH_BYTES = 40
+    DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+
+    def __init__(self, level_count, action_count=4, memory_budget=DEFAULT_MEMORY_BUDGET,
+                 min_visits=5, half_life=10000, evict_fraction=1/16, sample_key=(0,) * 8):
+        """
+        Initialize sparse multi-resolution Q-table
+
+        States are tuples with one hashable key per resolution level, ordered
+        coarse to fine. Every level is updated on each visit; lookups use the
+        finest level visited at least `min_visits` times, or the coarsest
+        existing entry when none has been visited that often.
+
+        Args:
+            level_count: Number of resolution levels in each state
+            action_count: Number of actions per entry
+            memory_budget: Bytes the table may use in total, including keys and dicts
+            min_visits: Visits before a finer entry overrides a coarser one
+            half_life: Updates after which an idle entry's visit count is halved for eviction
+            evict_fraction: Fraction of capacity freed when the table is full
+            sample_key: A representative key, used to measure per-entry memory
+        """
+        self.level_count = level_count
+        self.action_count = action_count
+        self.min_visits = min_visits
+        self.half_life = half_life
+
+        self.entry_bytes = self.measure_entry_bytes(action_count, sample_key)
+        self.capacity = int(memory_budget // self.entry_bytes)
+        if self.capacity < level_count:
+            raise ValueError(
+                f"memory_budget of {memory_budget} bytes holds {self.capacity} entries, "
+                f"need at least one per level ({level_count})"
+            )
+        self.evict_count = max(1, int(self.capacity * evict_fraction))
+
+        # Entry storage, preallocated so memory stays within the budget
+        self.q = np.zeros((self.capacity, action_count), dtype=np.float32)
+        self.visits = np.zeros(self.capacity, dtype=np.int32)
+        self.last_used = np.zeros(self.capacity, dtype=np.int64)
+
+        # One dict per level mapping key -> slot, plus the reverse mapping for eviction
+        self.levels = [{} for _ in range(level_count)]
+        self.slot_keys = [None] * self.capacity
+        self.free_slots = np.arange(self.capacity - 1, -1, -1, dtype=np.int64)
+        self.free_count = self.capacity
+        self.tick = 0
+        self.evicted = 0
+
+        # Returned for states never seen at any level
+        self._empty = np.zeros(action_count, dtype=np.float32)
+        self._empty.flags.writeable = False
+
+    def __len__(self):
+        return self.capacity - self.free_count
+
+    @classmethod
+    def measure_entry_bytes(cls, action_count, sample_key):
+        """Bytes one entry costs: array rows, key objects, dict entry and slot bookkeeping"""
+        arrays = action_count * 4 + 4 + 8 + 8  # q, visits, last_used, free_slots
+        key = _object_bytes(sample_key) + sum(
+            _object_bytes(item) for item in sample_key
+            if not (isinstance(item, int) and -5 <= item <= 256)  # small ints are shared
+        )
+        slot = _object_bytes(2 ** 20)  # the slot int stored as dict value
+        reverse = 8 + _object_bytes((0, sample_key))  # slot_keys pointer and (level, key) tuple
+        return arrays + key + slot + reverse + cls.DICT_ENTRY_BYTES + cls.EVICT_SCRATCH_BYTES
+
+    def memory_usage(self):
+        """Upper bound on bytes used by stored entries"""
+        return len(self) * self.entry_bytes
+
+    def lookup(self, state):
+        """Return the slot used for state's Q-values, or None if no level has an entry"""
+        fallback = None
+        for level in range(self.level_count - 1, -1, -1):
+            slot = self.levels[level].get(state[level])
+            if slot is None:
+                continue
+            if self.visits[slot] >= self.min_visits:
+                return slot
+            fallback = slot  # coarser entries have pooled more experience
+        return fallback
+
+    def values(self, state):
+        """Get Q-values for state, falling back from fine to coarse levels"""
+        slot = self.lookup(state)
+        return self._empty if slot is None else self.q[slot]
+
+    def slots(self, state, evicted=None):
+        """
+        Get (creating if needed) the slot of state at every level, coarse to fine
+
+        Arrays of slots freed to make room are appended to `evicted` if given,
+        so callers holding slot references can drop them.
+        """
+        self.tick += 1
+        result = []
+        for level in range(self.level_count):
+            key = state[level]
+            slot = self.levels[level].get(key)
+            if slot is None:
+                if not self.free_count:
+                    victims = self.evict()
+                    if evicted is not None:
+                        evicted.append(victims)
+                slot = self._allocate(level, key)
+            self.visits[slot] += 1
+            self.last_used[slot] = self.tick
+            result.append(slot)
+        return result
+
+    def update(self, state, action, target, learning_rate):
+        """Move Q(state, action) towards target at every level"""
+        slots = self.slots(state)
+        q = self.q[slots, action]
+        self.q[slots, action] = q + learning_rate * (target - q)
+
+    def _allocate(self, level, key):
+        self.free_count -= 1
+        slot = int(self.free_slots[self.free_count])
+        self.levels[level][key] = slot
+        self.slot_keys[slot] = (level, key)
+        self.q[slot] = 0
+        self.visits[slot] = 0
+        return slot
+
+    def evict(self):
+        """Free the coldest, least visited entries and return their slots"""
+        age = (self.tick - self.last_used).astype(np.float32)
+        score = self.visits * np.exp2(-age / self.half_life)
+        score[self.free_slots[:self.free_count]] = np.inf
+        score[self.last_used == self.tick] = np.inf  # keep entries touched by the current update
+        victims = np.argpartition(score, self.evict_count - 1)[:self.evict_count]
+        victims = victims[np.isfinite(score[victims])]
+        for slot in victims.tolist():
+            level, key = self.slot_keys[slot]
+            del self.levels[level][key]
+            self.slot_keys[slot] = None
+            self.free_slots[self.free_count] = slot
+            self.free_count += 1
+        self.evicted += len(victims)
+        return victims
+
+class EligibilityTraces:
+    def __init__(self, cutoff=0.01, capacity=64):
+        """
+        Replacing eligibility traces over SparseQTable entries
+
+        Only the active (slot, action) pairs are kept, in compact arrays, so
+        one fancy-indexed operation updates every traced entry. Traces that
+        decay below `cutoff` are pruned.
+
+        Args:
+            cutoff: Trace value below which an entry is dropped
+            capacity: Initial size of the trace arrays (grown as needed)
+        """
+        self.cutoff = cutoff
+        self.slots = np.zeros(capacity, dtype=np.int64)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.levels = np.zeros(capacity, dtype=np.int64)
+        self.values = np.zeros(capacity, dtype=np.float32)
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def visit(self, slots, action):
+        """Set the trace of action at each level's slot to 1"""
+        for level, slot in enumerate(slots):
+            n = self.count
+            match = np.flatnonzero((self.slots[:n] == slot) & (self.actions[:n] == action))
+            if match.size:
+                self.levels[match[0]] = level
+                self.values[match[0]] = 1.0
+                continue
+            if n == self.values.shape[0]:
+                self._grow()
+            self.slots[n] = slot
+            self.actions[n] = action
+            self.levels[n] = level
+            self.values[n] = 1.0
+            self.count = n + 1
+
+    def apply(self, q, deltas, learning_rate):
+        """Add learning_rate * delta * trace to every traced entry of q, using each entry's level delta"""
+        n = self.count
+        q[self.slots[:n], self.actions[:n]] += learning_rate * deltas[self.levels[:n]] * self.values[:n]
+
+    def decay(self, factor):
+        """Scale all traces by factor and prune those below the cutoff"""
+        n = self.count
+        self.values[:n] *= factor
+        self._compact(self.values[:n] >= self.cutoff)
+
+    def discard(self, slots):
+        """Drop traces pointing at the given (e.g. evicted) slots"""
+        n = self.count
+        self._compact(~np.isin(self.slots[:n], slots))
+
+    def _compact(self, keep):
+        n = int(np.count_nonzero(keep))
+        if n == self.count:
+            return
+        for arr in (self.slots, self.actions, self.levels, self.values):
+            arr[:n] = arr[:self.count][keep]
+        self.count = n
+
+    def _grow(self):
+        size = 2 * self.values.shape[0]
+        self.slots = np.resize(self.slots, size)
+        self.actions = np.resize(self.actions, size)
+        self.levels = np.resize(self.levels, size)
+        self.values = np.resize(self.values, size)
@@ -0,0 +1,69 @@
+import os
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pygame
+import pytest
+from game import SoccerGame
+from settings import STATE_PLAYING
+
+WARMUP_STEPS = 300
+MEASURED_STEPS = 1000
+# Per-step peak above the starting memory. A typical step measures about
+# 96 bytes; a temporary array made every frame pushes that past TYPICAL_STEP_BYTES.
+# The interpreter occasionally refills its float free list mid-step, so single
+# steps may reach a few hundred bytes, but never a numpy reduction's worth
+TYPICAL_STEP_BYTES = 128
+MAX_STEP_BYTES = 512
+
+
+def make_game(use_q_learning, training_mode):
+    """Start a game in the playing state with the countdown skipped"""
+    game = SoccerGame(use_q_learning=True, training_mode=training_mode)
+    game.use_q_learning = use_q_learning  # same as pressing Q in game
+    game.game_state = STATE_PLAYING
+    game.game_active = True
+    return game
+
+
+@pytest.mark.parametrize("use_q_learning, training_mode", [
+    (False, False), (True, False), (True, True),
+], ids=["ai_move", "q_move", "q_move_training"])
+def test_steady_state_update_does_not_allocate(monkeypatch, use_q_learning, training_mode):
+    # get_pressed builds a fresh ScancodeWrapper (about 8 KB) on every call
+    keys = pygame.key.get_pressed()
+    monkeypatch.setattr(pygame.key, "get_pressed", lambda: keys)
+
+    game = make_game(use_q_learning, training_mode)
+    for _ in range(WARMUP_STEPS):
+        game.game_active = True
+        game.update()
+
+    peaks = []
+    tracemalloc.start()
+    try:
+        # The interpreter and numpy fill a few lazy caches the first time
+        # code runs under tracing; let that happen before measuring
+        for _ in range(WARMUP_STEPS):
+            game.game_active = True
+            game.update()
+        for _ in range(MEASURED_STEPS):
+            game.game_active = True  # skip the countdown after goals
+            entries, goals, frame = len(game.q_agent.q_table), sum(game.score), game.current_frame
+            start = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            game.update()
+            # Adding a Q-table state, a goal or a new episode allocates by design
+            if (len(game.q_agent.q_table) == entries and sum(game.score) == goals
+                    and game.current_frame >= frame):
+                peaks.append(tracemalloc.get_traced_memory()[1] - start)
+    finally:
+        tracemalloc.stop()
+
+    assert len(peaks) > MEASURED_STEPS // 2
+    typical = np.percentile(peaks, 95)
+    assert typical <= TYPICAL_STEP_BYTES, f"95% of steps peak within {typical} bytes of their starting memory"
+    assert max(peaks) <= MAX_STEP_BYTES, f"a step peaked {max(peaks)} bytes above its starting memory"
@@ -0,0 +1,33 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+from game import SoccerGame
+from settings import HEIGHT
+
+
+def test_snapshot_restore_round_trip():
+    game = SoccerGame()
+    game.ball.vel[:] = (3, -2)
+    state = game.snapshot()
+
+    for player in (game.p1, game.p2, game.p3):
+        player.pos += 17
+    for _ in range(10):
+        game.ball.update()
+    assert not np.array_equal(game.snapshot(), state)
+
+    game.restore(state)
+    np.testing.assert_array_equal(game.snapshot(), state)
+    np.testing.assert_array_equal(game.ball.vel, (3, -2))
+
+
+def test_left_wall_goal_counts_for_player_2():
+    game = SoccerGame()
+    goal_y = HEIGHT // 2 + (110 if game.ball.is_large_field else 0)
+    game.ball.pos[:] = (game.field_rect.left, goal_y)
+
+    game._check_goal()
+    assert game.score == [0, 1]
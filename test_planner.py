@@ -0,0 +1,67 @@
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pygame
+import pytest
+from objects import Player, Ball
+from planner import RolloutPlanner, plan_move
+from settings import *
+
+FIELD = pygame.Rect(50, 50, WIDTH - 100, HEIGHT - 100)
+
+
+def make_scene(player_pos, ball_pos):
+    """AI player with one stationary opponent far away and a resting ball"""
+    player = Player(*player_pos, BLUE, ai=True)
+    opponent = Player(FIELD.left, FIELD.top, RED)
+    ball = Ball(*ball_pos, FIELD)
+    ball.vel[:] = 0
+    return player, opponent, ball
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_plan_moves_towards_ball_on_the_left(seed):
+    # Ball level with the player's centre, a short way to its left
+    player, opponent, ball = make_scene((500, 230), (440, 250))
+    planner = RolloutPlanner(time_budget=1.0)
+    planner.rng = np.random.default_rng(seed)
+
+    assert plan_move(player, ball, (opponent,), planner) == 2  # LEFT
+
+
+def test_plan_does_not_push_ball_into_own_goal():
+    # Ball between the player and the left wall, where team 1 concedes (Ball.check_goal)
+    player, opponent, ball = make_scene((120, 230), (90, 250))
+    planner = RolloutPlanner(team=1, time_budget=1.0)
+    planner.rng = np.random.default_rng(0)
+
+    assert plan_move(player, ball, (opponent,), planner) != 2  # not LEFT
+
+
+def test_plan_move_stays_within_frame_budget():
+    player, opponent, ball = make_scene((600, 250), (400, 250))
+    ball.vel[:] = (3, 1)
+    planner = RolloutPlanner()
+    frame_budget = 1.0 / FPS
+
+    times = []
+    for _ in range(200):
+        start = time.perf_counter()
+        plan_move(player, ball, (opponent,), planner)
+        times.append(time.perf_counter() - start)
+        ball.update()
+        ball.collide_with_player(player)
+
+    assert np.percentile(times, 99) < frame_budget
+
+
+def test_plan_cuts_rollouts_short_when_out_of_time():
+    player, opponent, ball = make_scene((600, 250), (400, 250))
+    planner = RolloutPlanner(time_budget=0.0)
+
+    assert plan_move(player, ball, (opponent,), planner) in range(planner.action_count)
+    assert planner.rollout_count < planner.max_rollout_count
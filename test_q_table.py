@@ -0,0 +1,169 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+from q_learning import QLearningAgent
+from q_table import SparseQTable
+
+
+def fill_table(agent, memory_budget, sample_key, positions):
+    """Build a table and update it with one state per row of positions"""
+    table = SparseQTable(len(agent.resolutions), agent.action_count, memory_budget=memory_budget,
+                         sample_key=sample_key)
+    for step, (ai_pos, ball_pos, player_pos) in enumerate(positions):
+        table.update(agent.discretize_state(ai_pos, ball_pos, player_pos), step % 4, 1.0, 0.1)
+    return table
+
+
+@pytest.mark.parametrize("memory_budget", [256 << 10, 1 << 20, 2 << 20])
+def test_full_table_stays_within_memory_budget(memory_budget):
+    agent = QLearningAgent(memory_budget=memory_budget)  # builds realistic multi-resolution keys
+    sample_key = agent.discretize_state((0, 0), (0, 0), (0, 0))[-1]
+    capacity = SparseQTable(len(agent.resolutions), memory_budget=memory_budget, sample_key=sample_key).capacity
+    positions = np.random.default_rng(0).uniform(0, 800, size=(3 * capacity, 3, 2))
+
+    # An untraced run first fills the interpreter's tuple free lists and
+    # numpy's caches, which are shared process-wide rather than owned by the table
+    fill_table(agent, memory_budget, sample_key, positions)
+
+    tracemalloc.start()
+    try:
+        table = fill_table(agent, memory_budget, sample_key, positions)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert table.evicted > table.capacity
+    assert current <= memory_budget
+    assert peak <= memory_budget
+
+
+def test_budget_smaller_than_one_entry_per_level_is_rejected():
+    with pytest.raises(ValueError):
+        SparseQTable(3, memory_budget=456)
+
+
+def test_lookup_falls_back_to_coarsest_entry_until_finer_ones_are_visited():
+    table = SparseQTable(3, memory_budget=1 << 20, min_visits=2)
+    coarse, mid, fine = table.slots(("a", "b", "c"))
+    assert table.lookup(("a", "b", "c")) == coarse
+
+    table.slots(("a", "b", "c"))
+    assert table.lookup(("a", "b", "c")) == fine
+
+    table.slots(("a", "b", "d"))
+    assert table.lookup(("a", "b", "d")) == mid
+    assert table.lookup(("a", "e", "f")) == coarse
+    assert table.lookup(("g", "e", "f")) is None
+
+
+def test_evict_frees_cold_rarely_visited_entries_first():
+    entry_bytes = SparseQTable.measure_entry_bytes(4, (0,) * 8)
+    table = SparseQTable(1, memory_budget=16 * entry_bytes, half_life=10, evict_fraction=1/4)
+    cold, hot, recent = range(0, 4), range(4, 12), range(12, 16)
+    for key in cold:
+        table.slots((key,))
+    for _ in range(10):
+        for key in hot:
+            table.slots((key,))
+    for key in recent:
+        table.slots((key,))
+    assert len(table) == table.capacity == 16
+
+    table.slots((16,))
+    assert table.evicted == 4
+    assert all(key not in table.levels[0] for key in cold)
+    assert all(key in table.levels[0] for key in [*hot, *recent, 16])
+
+
+def test_load_rejects_table_built_for_another_configuration(tmp_path):
+    filename = str(tmp_path / "q_table.pkl")
+    QLearningAgent(memory_budget=2 << 20).save(filename)
+
+    assert not QLearningAgent(memory_budget=1 << 20).load(filename)
+    assert not QLearningAgent(memory_budget=2 << 20, resolutions=((4, 3), (16, 10))).load(filename)
+    assert QLearningAgent(memory_budget=2 << 20).load(filename)
+
+
+def chain_states(count, level_count=3):
+    """States that share no key at any level"""
+    return [tuple((level, i) for level in range(level_count)) for i in range(count)]
+
+
+def run_chain(agent, states, actions):
+    """Step through states with the given actions, rewarding only the last step"""
+    for i, action in enumerate(actions):
+        reward = 1.0 if i == len(actions) - 1 else 0.0
+        agent.update_q_value(states[i], action, reward, states[i + 1])
+
+
+@pytest.mark.parametrize("trace_decay, expected", [
+    (None, [0, 0, 0, 0, 1]),
+    (0.9, [0.81 ** 4, 0.81 ** 3, 0.81 ** 2, 0.81, 1]),
+])
+def test_reward_propagates_back_along_a_greedy_chain(trace_decay, expected):
+    agent = QLearningAgent(learning_rate=1.0, discount_factor=0.9, memory_budget=1 << 20,
+                           trace_decay=trace_decay)
+    states = chain_states(6)
+    run_chain(agent, states, [0] * 5)
+
+    values = [agent.q_values(state)[0] for state in states[:5]]
+    assert values == pytest.approx(expected, abs=1e-6)
+
+
+def test_q_lambda_works_on_the_default_agent():
+    agent = QLearningAgent(trace_decay=0.9)
+    assert agent.sparse
+    assert agent.q_table.capacity * agent.q_table.entry_bytes <= SparseQTable.DEFAULT_MEMORY_BUDGET
+
+
+def test_exploratory_action_clears_earlier_traces():
+    agent = QLearningAgent(learning_rate=1.0, discount_factor=0.9, trace_decay=0.9)
+    states = chain_states(3)
+    # Q-values are all zero, so action 0 is greedy and action 1 is not
+    run_chain(agent, states, [0, 1])
+
+    assert agent.q_values(states[0])[0] == 0
+    assert agent.q_values(states[1])[1] == pytest.approx(1)
+
+
+def test_traces_below_cutoff_are_pruned():
+    agent = QLearningAgent(discount_factor=0.9, trace_decay=0.9, trace_cutoff=0.5)
+    states = chain_states(5)
+    for state, next_state in zip(states, states[1:]):
+        agent.update_q_value(state, 0, 0.0, next_state)
+
+    # 0.81, 0.81 ** 2 and 0.81 ** 3 stay above the cutoff at each of the 3 levels, 0.81 ** 4 does not
+    traces = agent.traces
+    assert len(traces) == 3 * 3
+    assert (traces.values[:traces.count] >= 0.5).all()
+
+
+def test_traces_follow_evicted_and_reused_slots():
+    # The agent's keys hold small ints, so they measure the same as the default sample key
+    agent = QLearningAgent(memory_budget=20 * SparseQTable.measure_entry_bytes(4, (0,) * 8),
+                           trace_decay=0.9, exploration_rate=0.0)
+    table, traces = agent.q_table, agent.traces
+    positions = np.random.default_rng(0).uniform(0, 800, size=(2000, 2, 3, 2))
+
+    for before, after in positions:
+        # Greedy actions keep the traces alive across many evictions
+        state = agent.discretize_state(*before)
+        agent.update_q_value(state, agent.get_best_action(state), 1.0, agent.discretize_state(*after))
+        for slot, level in zip(traces.slots[:traces.count], traces.levels[:traces.count]):
+            assert table.slot_keys[slot] is not None
+            assert table.slot_keys[slot][0] == level
+
+    assert table.evicted > table.capacity
+
+
+def test_load_clears_traces(tmp_path):
+    agent = QLearningAgent(memory_budget=1 << 20, trace_decay=0.9, exploration_rate=0.0)
+    filename = str(tmp_path / "q_table.pkl")
+    agent.save(filename)
+    state = agent.discretize_state((100, 100), (200, 200), (300, 300))
+    agent.update_q_value(state, agent.get_best_action(state), 1.0, state)
+    assert len(agent.traces) > 0
+
+    assert agent.load(filename)
+    assert len(agent.traces) == 0